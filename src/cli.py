@@ -2,14 +2,21 @@
 CLI for managing Nudge daemon
 """
 
+import os
 import sys
+import time
+import signal
 import logging
 import subprocess
 from pathlib import Path
+from datetime import datetime
 from typing import Optional
 
-from src.daemon import ClaudeMonitorDaemon, setup_logging
+from src.daemon import ClaudeMonitorDaemon, setup_logging, read_daemon_pid
+from src.daemon.sessions import SOCKET_FILE, send_command
 from src.config import Config
+from src.profiler import PROFILE_REQUEST, PROFILE_REPORT
+from src.history import HISTORY_FILE, connect, parse_time, query_summary, query_terminal
 
 logger = logging.getLogger(__name__)
 
@@ -24,28 +31,31 @@ LAUNCHD_PLIST = """<?xml version="1.0" encoding="UTF-8"?>
     <array>
         <string>{python_path}</string>
         <string>-m</string>
-        <string>nudge.daemon</string>
+        <string>nudge.daemon</string>{extra_args}
     </array>
     
     <key>RunAtLoad</key>
     <true/>
+    {schedule}
+    <key>StandardOutPath</key>
+    <string>{home}/.nudge/nudge.log</string>
     
+    <key>StandardErrorPath</key>
+    <string>{home}/.nudge/nudge.err</string>
+</dict>
+</plist>
+"""
+
+# Polling mode: launchd restarts the daemon and re-checks every 5 s
+LAUNCHD_SCHEDULE = """
     <key>KeepAlive</key>
     <dict>
         <key>SuccessfulExit</key>
         <false/>
     </dict>
     
-    <key>StandardOutPath</key>
-    <string>{home}/.nudge/nudge.log</string>
-    
-    <key>StandardErrorPath</key>
-    <string>{home}/.nudge/nudge.err</string>
-    
     <key>StartInterval</key>
     <integer>5</integer>
-</dict>
-</plist>
 """
 
 
@@ -56,7 +66,7 @@ class CLI:
     LAUNCHD_PATH = Path.home() / "Library/LaunchAgents/com.nudge.daemon.plist"
     
     @staticmethod
-    def install():
+    def install(on_demand: bool = False):
         """Install daemon as launchd service"""
         logger.info("Installing Nudge as background service...")
         
@@ -65,9 +75,13 @@ class CLI:
         config.ensure_config_dir()
         
         # Create launchd plist
+        # On-demand daemons stay dormant between sessions, so launchd needs
+        # neither KeepAlive nor a StartInterval for them
         plist_content = LAUNCHD_PLIST.format(
             python_path=sys.executable,
-            home=Path.home()
+            home=Path.home(),
+            extra_args="\n        <string>--on-demand</string>" if on_demand else "",
+            schedule="" if on_demand else LAUNCHD_SCHEDULE
         )
         
         CLI.LAUNCHD_PATH.parent.mkdir(parents=True, exist_ok=True)
@@ -110,12 +124,14 @@ class CLI:
         return True
     
     @staticmethod
-    def start():
+    def start(on_demand: bool = False):
         """Start daemon (foreground mode for testing)"""
         logger.info("Starting Nudge daemon...")
         
         config = Config()
         daemon = ClaudeMonitorDaemon(config)
+        if on_demand:
+            daemon.on_demand = True
         
         try:
             daemon.run()
@@ -138,6 +154,93 @@ class CLI:
             print("❌ Nudge is not running")
             return False
     
+    @staticmethod
+    def session(command: str, terminal_id: str, pid: Optional[int] = None):
+        """Register or unregister a session with an on-demand daemon"""
+        socket_path = Config().config_path.parent / SOCKET_FILE
+        line = f"{command} {terminal_id}" + (f" {pid}" if pid else "")
+
+        reply = send_command(socket_path, line)
+        if reply is None:
+            logger.error(f"No on-demand daemon listening on {socket_path}")
+            return False
+        if not reply.startswith("ok"):
+            logger.error(f"Daemon rejected {command}: {reply}")
+            return False
+
+        return True
+
+    @staticmethod
+    def profile(duration: Optional[float] = None):
+        """Profile the running daemon and print the report"""
+        config = Config()
+        state_dir = config.config_path.parent
+        duration = duration or config.get("daemon.profile_duration", 60)
+
+        pid = read_daemon_pid(state_dir)
+        if pid is None:
+            print("❌ Nudge is not running")
+            return False
+
+        report_path = state_dir / PROFILE_REPORT
+        if report_path.exists():
+            report_path.unlink()
+
+        (state_dir / PROFILE_REQUEST).write_text(str(duration))
+        os.kill(pid, signal.SIGUSR1)
+        print(f"Profiling daemon (pid {pid}) for {duration:g}s...")
+
+        # Allow a few loop iterations for the daemon to pick up the request
+        deadline = time.time() + duration + 5 * config.get("daemon.check_interval", 1) + 5
+        while not report_path.exists():
+            if time.time() > deadline:
+                logger.error("Timed out waiting for profile report")
+                return False
+            time.sleep(0.5)
+
+        print(report_path.read_text())
+        return True
+
+    @staticmethod
+    def history(since: str = "today", until: Optional[str] = None,
+                terminal_id: Optional[str] = None):
+        """Show detection history per terminal, or events of one terminal"""
+        db_path = Config().config_path.parent / HISTORY_FILE
+
+        if not db_path.exists():
+            print("No history yet")
+            return False
+
+        try:
+            since_ts = parse_time(since)
+            until_ts = parse_time(until) if until else time.time() + 1
+        except ValueError as e:
+            print(f"Invalid time: {e}")
+            return False
+
+        conn = connect(db_path)
+        try:
+            if terminal_id:
+                rows = query_terminal(conn, terminal_id, since_ts, until_ts)
+                for ts, kind, detail, wait in rows:
+                    stamp = datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S")
+                    waited = f"  waited {wait:.1f}s" if wait is not None else ""
+                    print(f"{stamp}  {kind:<13}{detail or '':<10}{waited}")
+            else:
+                rows = query_summary(conn, since_ts, until_ts)
+                print(f"{'terminal':<36}{'questions':>10}{'notified':>10}{'avg wait':>10}{'max wait':>10}  last question")
+                for terminal, questions, notified, avg_wait, max_wait, last_ts in rows:
+                    last = datetime.fromtimestamp(last_ts).strftime("%Y-%m-%d %H:%M:%S") if last_ts else "-"
+                    avg = f"{avg_wait:.1f}s" if avg_wait is not None else "-"
+                    longest = f"{max_wait:.1f}s" if max_wait is not None else "-"
+                    print(f"{terminal or '(untagged)':<36}{questions:>10}{notified:>10}{avg:>10}{longest:>10}  {last}")
+        finally:
+            conn.close()
+
+        if not rows:
+            print("No events in range")
+        return True
+
     @staticmethod
     def logs():
         """Show daemon logs"""
@@ -157,6 +260,13 @@ class CLI:
             logger.error(f"Failed to read logs: {e}")
 
 
+def _option(name: str) -> Optional[str]:
+    """Return value following a --flag in argv, None if flag absent"""
+    if name not in sys.argv:
+        return None
+    return sys.argv[sys.argv.index(name) + 1]
+
+
 def main():
     """Main CLI entry point"""
     setup_logging(logging.INFO)
@@ -167,22 +277,27 @@ def main():
         print("Usage: nudge <command>")
         print()
         print("Commands:")
-        print("  install      Install as background service")
+        print("  install      Install as background service (--on-demand)")
         print("  uninstall    Uninstall background service")
-        print("  start        Start daemon (foreground)")
+        print("  start        Start daemon (foreground, --on-demand)")
         print("  stop         Stop daemon")
         print("  status       Check daemon status")
         print("  logs         Show daemon logs")
+        print("  register     Register session with on-demand daemon (TERM_ID [PID|parent])")
+        print("  unregister   Unregister session (TERM_ID)")
+        print("  profile      Profile running daemon (--duration SECONDS)")
+        print("  history      Show detections (--since, --until, --terminal ID)")
         return
     
     command = sys.argv[1]
+    on_demand = "--on-demand" in sys.argv
     
     if command == "install":
-        CLI.install()
+        CLI.install(on_demand)
     elif command == "uninstall":
         CLI.uninstall()
     elif command == "start":
-        CLI.start()
+        CLI.start(on_demand)
     elif command == "stop":
         # launchctl will handle stopping via unload/load cycle
         print("Use 'nudge uninstall' to stop the daemon")
@@ -190,6 +305,34 @@ def main():
         CLI.status()
     elif command == "logs":
         CLI.logs()
+    elif command in ("register", "unregister"):
+        try:
+            terminal_id = sys.argv[2]
+            pid = sys.argv[3] if command == "register" and len(sys.argv) > 3 else None
+            # "parent" ties the session to the shell (or subshell) running us
+            pid = os.getppid() if pid == "parent" else int(pid) if pid else None
+        except (IndexError, ValueError):
+            print(f"Usage: nudge {command} TERM_ID" + (" [PID|parent]" if command == "register" else ""))
+            return
+        if not CLI.session(command, terminal_id, pid):
+            sys.exit(1)
+    elif command == "profile":
+        try:
+            duration = _option("--duration")
+            duration = float(duration) if duration is not None else None
+        except (IndexError, ValueError):
+            print("Usage: nudge profile [--duration SECONDS]")
+            return
+        CLI.profile(duration)
+    elif command == "history":
+        try:
+            CLI.history(
+                since=_option("--since") or "today",
+                until=_option("--until"),
+                terminal_id=_option("--terminal")
+            )
+        except IndexError:
+            print("Usage: nudge history [--since today|6h|7d|ISO] [--until ...] [--terminal ID]")
     else:
         print(f"Unknown command: {command}")
         print("Run 'nudge' for help")
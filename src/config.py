@@ -33,7 +33,17 @@ class Config:
         },
         "daemon": {
             "check_interval": 1,  # seconds
-            "max_lines_per_check": 100
+            "max_lines_per_check": 100,
+            "quiescence_timeout": 5,  # seconds silent after a prompt; 0 disables
+            "bulk_scan_threshold": 1048576,  # unread bytes; 0 disables bulk scan
+            "profile_duration": 60,  # seconds, for `nudge profile`
+            "on_demand": False,  # only wake while sessions are registered
+            "idle_grace_period": 30,  # seconds after last session ends
+            "exit_when_idle": False  # exit instead; needs a socket-activating supervisor
+        },
+        "history": {
+            "enabled": True,
+            "retention_days": 30
         }
     }
     
@@ -2,7 +2,12 @@
 Main daemon loop for monitoring Claude Code output
 """
 
+import os
 import time
+import signal
+import socket
+import selectors
+import subprocess
 import logging
 import sys
 from pathlib import Path
@@ -12,9 +17,17 @@ from datetime import datetime
 from src.detector import QuestionDetector
 from src.notifier import NotificationManager
 from src.config import Config
+from src.quiescence import QuiescenceTracker
+from src.scanner import BacklogScanner
+from src.history import HistoryStore, HISTORY_FILE
+from src.profiler import DaemonProfiler, PROFILE_REQUEST, PROFILE_REPORT
+from src.daemon.sessions import SessionServer, SOCKET_FILE
 
 logger = logging.getLogger(__name__)
 
+# PID file in the config directory, used by the CLI to signal a running daemon
+PID_FILE = "nudge.pid"
+
 
 class ClaudeMonitorDaemon:
     """Monitors log files for Claude Code questions"""
@@ -32,9 +45,39 @@ class ClaudeMonitorDaemon:
 
         # Track file positions to only read new lines
         self.file_positions: Dict[Path, int] = {}
+
+        # Unread regions at least this large are scanned in bulk (0 disables)
+        self.bulk_scan_threshold = self.config.get("daemon.bulk_scan_threshold", 1024 * 1024)
+        self.scanner = BacklogScanner(self.detector)
+
         self.notification_cooldown = 2  # seconds between notifications
         self.last_notification = None
 
+        # Second signal: silence after prompt-like output (0 disables)
+        quiescence_timeout = self.config.get("daemon.quiescence_timeout", 5)
+        self.quiescence: Optional[QuiescenceTracker] = \
+            QuiescenceTracker(quiescence_timeout) if quiescence_timeout else None
+
+        # Self-profiling, requested via SIGUSR1 (see `nudge profile`)
+        self.state_dir = self.config.config_path.parent
+        self.profiler: Optional[DaemonProfiler] = None
+        self._profile_request: Optional[float] = None
+
+        # Event journal for `nudge history`; terminals awaiting an answer map
+        # to the monotonic time their question was detected
+        self.history: Optional[HistoryStore] = None
+        if self.config.get("history.enabled", True):
+            self.history = HistoryStore(
+                self.state_dir / HISTORY_FILE,
+                retention_days=self.config.get("history.retention_days", 30)
+            )
+        self._awaiting: Dict[Optional[str], float] = {}
+        self._awaiting_pruned_at = time.monotonic()
+
+        # On-demand mode blocks until a session registers on the socket
+        self.on_demand = self.config.get("daemon.on_demand", False)
+        self.wakeups = 0  # loop iterations, to compare idle cost of both modes
+
         self.running = False
         logger.info("Daemon initialized")
 
@@ -46,6 +89,10 @@ class ClaudeMonitorDaemon:
         elapsed = (datetime.now() - self.last_notification).total_seconds()
         return elapsed >= self.notification_cooldown
 
+    def _stat_log(self, log_path: Path) -> int:
+        """Return current size of log file"""
+        return log_path.stat().st_size
+
     def _process_log_file(self, log_path: Path) -> Optional[str]:
         """
         Check for new lines in log file that indicate a question
@@ -54,14 +101,19 @@ class ClaudeMonitorDaemon:
             Terminal ID if question detected, None otherwise
         """
         try:
-            current_size = log_path.stat().st_size
+            current_size = self._stat_log(log_path)
             last_pos = self.file_positions.get(log_path, 0)
 
             # File was truncated or reset
             if current_size < last_pos:
                 last_pos = 0
 
+            if self.bulk_scan_threshold and current_size - last_pos >= self.bulk_scan_threshold:
+                return self._scan_backlog(log_path, last_pos)
+
             detected_terminal_id = None
+            detected = []
+            now = time.monotonic()
 
             with open(log_path, 'r', encoding='utf-8', errors='ignore') as f:
                 f.seek(last_pos)
@@ -72,14 +124,39 @@ class ClaudeMonitorDaemon:
                         terminal_id = self.detector.extract_terminal_id(line)
                         logger.info(f"Question detected in {log_path} from terminal: {terminal_id}")
                         detected_terminal_id = terminal_id
+                        detected.append(terminal_id)
+
+                        # Already notified through the question path
+                        if self.quiescence is not None:
+                            self.quiescence.observe(terminal_id, False, now)
+                        continue
 
-                    # Stop after reading enough lines (efficiency)
                     if self.detector.should_ignore_line(line):
                         continue
 
+                    if self.quiescence is not None or self._awaiting:
+                        terminal_id = self.detector.extract_terminal_id(line)
+
+                        if terminal_id in self._awaiting:
+                            self._record("resumed", terminal_id,
+                                         wait=now - self._awaiting.pop(terminal_id))
+
+                        if self.quiescence is not None:
+                            # Menu options and borders after a prompt belong to it
+                            prompt_like = self.detector.is_prompt_like(line) or (
+                                self.quiescence.is_armed(terminal_id) and
+                                self.detector.is_prompt_continuation(line)
+                            )
+                            self.quiescence.observe(terminal_id, prompt_like, now)
+
                 # Update position
                 self.file_positions[log_path] = f.tell()
 
+            # Output after the question in this same read doesn't count as
+            # an answer, so waits start once the read is done
+            for terminal_id in detected:
+                self._record_detection(terminal_id, "question", now)
+
             return detected_terminal_id
 
         except FileNotFoundError:
@@ -89,6 +166,27 @@ class ClaudeMonitorDaemon:
             logger.error(f"Error reading {log_path}: {e}")
             return None
 
+    def _scan_backlog(self, log_path: Path, last_pos: int) -> Optional[str]:
+        """
+        Catch up on a large unread region without reading it line by line
+
+        Quiescence tracking is skipped for the backlog: its output is old,
+        so silence after it says nothing about the session now.
+
+        Returns:
+            Terminal ID of the last question detected, None otherwise
+        """
+        detections, end = self.scanner.scan_file(log_path, last_pos)
+        self.file_positions[log_path] = end
+        logger.debug(f"Bulk scanned {end - last_pos} bytes of {log_path}")
+
+        now = time.monotonic()
+        for _, terminal_id, _ in detections:
+            logger.info(f"Question detected in {log_path} from terminal: {terminal_id}")
+            self._record_detection(terminal_id, "question", now)
+
+        return detections[-1][1] if detections else None
+
     def check_logs(self) -> bool:
         """
         Check all monitored log files for questions
@@ -108,29 +206,204 @@ class ClaudeMonitorDaemon:
             terminal_id = self._process_log_file(log_path)
             if terminal_id is not None:
                 # Question detected, send notification if cooldown allows
-                if self._should_notify():
-                    if self.notifier.send_notification(terminal_id=terminal_id):
-                        self.last_notification = datetime.now()
-                        # Try to focus IDE immediately on next iteration
-                        time.sleep(0.1)
-                        self.notifier.focus_ide(terminal_id=terminal_id)
+                if self._notify(terminal_id, "question"):
                     return True
 
+        # Only take an expiry when it can be dispatched; the rest stay armed
+        # and fire on later checks once the cooldown has passed
+        if self.quiescence is not None and self._should_notify():
+            for terminal_id in self.quiescence.expired(time.monotonic(), limit=1):
+                logger.info(f"Terminal {terminal_id} went quiet after prompt-like output")
+                self._record_detection(terminal_id, "idle", time.monotonic())
+                return self._notify(terminal_id, "idle")
+
         return False
 
+    def _next_timeout(self, check_interval: float) -> float:
+        """Seconds until the next check: check_interval, or sooner if a
+        quiescence deadline is due (but not before the cooldown ends)"""
+        if self.quiescence is None:
+            return check_interval
+
+        deadline = self.quiescence.next_deadline()
+        if deadline is None:
+            return check_interval
+
+        wait = deadline - time.monotonic()
+        if self.last_notification is not None:
+            elapsed = (datetime.now() - self.last_notification).total_seconds()
+            wait = max(wait, self.notification_cooldown - elapsed)
+
+        return min(check_interval, max(0, wait))
+
+    def _notify(self, terminal_id: Optional[str], signal_type: str) -> bool:
+        """
+        Send notification and focus IDE if cooldown allows
+
+        Args:
+            terminal_id: Terminal that is waiting for input
+            signal_type: What triggered it ("question" or "idle")
+
+        Returns:
+            True if cooldown allowed a notification attempt
+        """
+        if not self._should_notify():
+            return False
+
+        if self.notifier.send_notification(terminal_id=terminal_id, signal_type=signal_type):
+            self.last_notification = datetime.now()
+            self._record("notification", terminal_id, signal_type)
+            # Try to focus IDE immediately on next iteration
+            time.sleep(0.1)
+            focused = self.notifier.focus_ide(terminal_id=terminal_id)
+            self._record("focus", terminal_id, "ok" if focused else "failed")
+        return True
+
+    def _record(self, kind: str, terminal_id: Optional[str],
+                detail: Optional[str] = None, wait: Optional[float] = None):
+        """Journal an event if history is enabled"""
+        if self.history is not None:
+            self.history.record(kind, terminal_id, detail, wait)
+
+    def _record_detection(self, terminal_id: Optional[str], signal_type: str, now: float):
+        """Journal a detection and start timing the wait for an answer"""
+        if self.history is None:
+            return
+
+        self.history.record("detection", terminal_id, signal_type)
+        self._awaiting[terminal_id] = now
+
+        # Terminals that never answer would otherwise be kept forever;
+        # their wait could not be reported past the retention period anyway
+        if now - self._awaiting_pruned_at >= HistoryStore.PRUNE_INTERVAL:
+            self._awaiting_pruned_at = now
+            cutoff = now - self.history.retention_days * 86400
+            if self.history.retention_days:
+                self._awaiting = {
+                    tid: since for tid, since in self._awaiting.items() if since >= cutoff
+                }
+
+    def _end_session(self, terminal_id: str):
+        """Forget per-terminal state of a session that has ended"""
+        self._awaiting.pop(terminal_id, None)
+        if self.quiescence is not None:
+            self.quiescence.observe(terminal_id, False, time.monotonic())
+
     def run(self):
         """Main daemon loop"""
+        if self.on_demand:
+            return self.run_on_demand()
+
         logger.info("Starting daemon loop...")
         self.running = True
 
         try:
             check_interval = self.config.get("daemon.check_interval", 1)
 
+            # Handler first: SIGUSR1's default action would kill us
+            self._install_signal_handlers()
+            self._write_pid()
+
             while self.running:
                 try:
+                    if self._profile_request is not None or self.profiler is not None:
+                        self._update_profiler()
+
                     self.check_logs()
+                    self.wakeups += 1
+                    time.sleep(self._next_timeout(check_interval))
+
+                except KeyboardInterrupt:
+                    logger.info("Received interrupt signal")
+                    break
+                except Exception as e:
+                    logger.error(f"Error in daemon loop: {e}")
                     time.sleep(check_interval)
 
+        finally:
+            self.stop()
+
+    def run_on_demand(self):
+        """
+        Event-driven loop that only polls logs while sessions are registered
+
+        With no sessions the daemon sits blocked in select() with no timeout.
+        When the last session ends it checks the logs once more for that
+        session's final output, then waits out the grace period without
+        polling. If no session registers by then it goes dormant again, or
+        exits if daemon.exit_when_idle is set.
+        """
+        logger.info("Starting on-demand daemon loop...")
+        self.running = True
+
+        check_interval = self.config.get("daemon.check_interval", 1)
+        grace_period = self.config.get("daemon.idle_grace_period", 30)
+        exit_when_idle = self.config.get("daemon.exit_when_idle", False)
+
+        server = SessionServer(self.state_dir / SOCKET_FILE)
+        selector = selectors.DefaultSelector()
+
+        # Signals (e.g. SIGUSR1 for profiling) must interrupt the blocking select
+        wakeup_r, wakeup_w = socket.socketpair()
+        wakeup_r.setblocking(False)
+        wakeup_w.setblocking(False)
+
+        try:
+            self.state_dir.mkdir(parents=True, exist_ok=True)
+            server.open(selector)
+            selector.register(wakeup_r, selectors.EVENT_READ)
+            signal.set_wakeup_fd(wakeup_w.fileno())
+
+            # Handler first: SIGUSR1's default action would kill us
+            self._install_signal_handlers()
+            self._write_pid()
+
+            idle_deadline: Optional[float] = None
+            was_active = False
+
+            while self.running:
+                if server.sessions:
+                    timeout = self._next_timeout(check_interval)
+                elif self.profiler is not None:
+                    timeout = check_interval
+                elif idle_deadline is not None:
+                    timeout = max(0, idle_deadline - time.monotonic())
+                else:
+                    timeout = None  # Dormant: no timers at all
+
+                try:
+                    events = selector.select(timeout)
+                    self.wakeups += 1
+
+                    for key, _ in events:
+                        if key.data is not None:
+                            key.data(key.fileobj)  # Session socket callback
+                        else:
+                            wakeup_r.recv(4096)
+
+                    if self._profile_request is not None or self.profiler is not None:
+                        self._update_profiler()
+
+                    server.reap()
+                    for terminal_id in server.pop_ended():
+                        self._end_session(terminal_id)
+
+                    if server.sessions:
+                        was_active = True
+                        idle_deadline = None
+                        self.check_logs()
+                    elif was_active:
+                        # Last session just ended; catch its final output
+                        was_active = False
+                        idle_deadline = time.monotonic() + grace_period
+                        self.check_logs()
+                    elif idle_deadline is not None and time.monotonic() >= idle_deadline:
+                        idle_deadline = None
+                        if exit_when_idle:
+                            logger.info("No sessions left, exiting")
+                            break
+                        logger.info("No sessions left, going dormant")
+
                 except KeyboardInterrupt:
                     logger.info("Received interrupt signal")
                     break
@@ -139,12 +412,121 @@ class ClaudeMonitorDaemon:
                     time.sleep(check_interval)
 
         finally:
+            signal.set_wakeup_fd(-1)
+            server.close()
+            selector.close()
+            wakeup_r.close()
+            wakeup_w.close()
             self.stop()
 
     def stop(self):
         """Stop the daemon"""
         self.running = False
-        logger.info("Daemon stopped")
+
+        if self.profiler is not None:
+            self.profiler.stop()
+            self.profiler = None
+
+        if self.history is not None:
+            self.history.close()
+            self.history = None
+
+        self._remove_pid()
+        logger.info(f"Daemon stopped after {self.wakeups} wakeups")
+
+    def _write_pid(self):
+        """Record our PID and start time so the CLI can signal us"""
+        started = process_start_time(os.getpid()) or ""
+        try:
+            self.state_dir.mkdir(parents=True, exist_ok=True)
+            (self.state_dir / PID_FILE).write_text(f"{os.getpid()}\n{started}\n")
+        except OSError as e:
+            logger.warning(f"Could not write PID file: {e}")
+
+    def _remove_pid(self):
+        """Remove PID file if it still belongs to this process"""
+        pid_path = self.state_dir / PID_FILE
+        try:
+            if pid_path.read_text().split("\n", 1)[0].strip() == str(os.getpid()):
+                pid_path.unlink()
+        except (OSError, ValueError):
+            pass
+
+    def _install_signal_handlers(self):
+        """Install SIGUSR1 handler that requests a profile"""
+        if not hasattr(signal, "SIGUSR1"):
+            return
+
+        try:
+            signal.signal(signal.SIGUSR1, self._handle_profile_signal)
+        except ValueError:
+            # Not in the main thread (e.g. embedded); profiling stays unavailable
+            logger.debug("Cannot install SIGUSR1 handler outside main thread")
+
+    def _handle_profile_signal(self, signum, frame):
+        """Request a profile; duration comes from the request file if present"""
+        duration = self.config.get("daemon.profile_duration", 60)
+        request_path = self.state_dir / PROFILE_REQUEST
+
+        try:
+            duration = float(request_path.read_text().strip())
+            request_path.unlink()
+        except (OSError, ValueError):
+            pass
+
+        self._profile_request = duration
+
+    def _update_profiler(self):
+        """Start a requested profile, or finish one whose duration elapsed"""
+        if self.profiler is None:
+            self.profiler = DaemonProfiler(
+                self, self._profile_request, self.state_dir / PROFILE_REPORT
+            )
+            self._profile_request = None
+            self.profiler.start()
+        elif self.profiler.expired:
+            self.profiler.stop()
+            self.profiler = None
+        else:
+            self.profiler.tick()
+
+
+def process_start_time(pid: int) -> Optional[str]:
+    """Start time of a process as reported by ps, None if it does not exist"""
+    try:
+        result = subprocess.run(
+            ["ps", "-p", str(pid), "-o", "lstart="],
+            capture_output=True,
+            timeout=2,
+            check=False
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+    started = result.stdout.decode().strip()
+    return started if result.returncode == 0 and started else None
+
+
+def read_daemon_pid(state_dir: Path) -> Optional[int]:
+    """
+    Find the PID of the running daemon
+
+    The PID file also records the daemon's start time, so after a crash a
+    PID reused by an unrelated process is never mistaken for the daemon.
+
+    Returns:
+        PID if the daemon that wrote the PID file is still running, None otherwise
+    """
+    try:
+        pid_line, started = (state_dir / PID_FILE).read_text().split("\n", 1)
+        pid = int(pid_line)
+    except (OSError, ValueError):
+        return None
+
+    if not started.strip() or process_start_time(pid) != started.strip():
+        return None
+
+    return pid
 
 
 def setup_logging(log_level=logging.INFO):
@@ -176,6 +558,8 @@ def main():
     config.ensure_config_dir()
 
     daemon = ClaudeMonitorDaemon(config)
+    if "--on-demand" in sys.argv:
+        daemon.on_demand = True
     daemon.run()
 
 
@@ -0,0 +1,220 @@
+"""
+Session registration socket for on-demand mode
+"""
+
+import os
+import socket
+import logging
+import selectors
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Unix socket in the config directory that wrappers register sessions on
+SOCKET_FILE = "nudge.sock"
+
+
+class SessionServer:
+    """Tracks active Claude sessions registered over a local socket
+
+    One command per line:
+        register <terminal_id> [pid]
+        unregister <terminal_id>
+        status
+    Each command is answered with ``ok <active sessions>`` or ``error <reason>``.
+    Sessions registered with a pid are dropped once that process is gone, so a
+    wrapper that crashes cannot keep the daemon awake. Clients are read
+    through the daemon's selector, so a slow client never stalls detection.
+    """
+
+    def __init__(self, socket_path: Path):
+        """
+        Initialize session server
+
+        Args:
+            socket_path: Path of the Unix socket to listen on
+        """
+        self.socket_path = socket_path
+        self.sessions: Dict[str, Optional[int]] = {}
+        self.sock: Optional[socket.socket] = None
+        self.selector: Optional[selectors.BaseSelector] = None
+        self._clients: Dict[socket.socket, bytes] = {}
+        self._ended: List[str] = []
+        self._owns_path = False
+
+    def open(self, selector: selectors.BaseSelector):
+        """
+        Start listening, reusing a socket passed by a supervisor if present
+
+        The listener and every client are registered on selector with a
+        callback as key.data; the loop calls key.data(key.fileobj) when ready.
+
+        Args:
+            selector: Selector the daemon loop waits on
+        """
+        self.sock = self._inherited_socket()
+
+        if self.sock is None:
+            if self.socket_path.exists():
+                if send_command(self.socket_path, "status") is not None:
+                    raise RuntimeError(f"Another daemon is listening on {self.socket_path}")
+                self.socket_path.unlink()  # Stale socket from a previous run
+
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.bind(str(self.socket_path))
+            os.chmod(self.socket_path, 0o600)
+            self.sock.listen(16)
+            self._owns_path = True
+
+        self.sock.setblocking(False)
+        self.selector = selector
+        selector.register(self.sock, selectors.EVENT_READ, self._accept)
+        logger.info(f"Listening for sessions on {self.socket_path}")
+
+    def _inherited_socket(self) -> Optional[socket.socket]:
+        """Pick up a listening socket passed as fd 3 (systemd LISTEN_FDS protocol)"""
+        if os.environ.get("LISTEN_PID") != str(os.getpid()):
+            return None
+
+        try:
+            if int(os.environ.get("LISTEN_FDS", "0")) < 1:
+                return None
+        except ValueError:
+            return None
+
+        logger.info("Using listening socket passed by supervisor")
+        return socket.socket(fileno=3)
+
+    def close(self):
+        """Stop listening, drop clients and remove socket file"""
+        for conn in list(self._clients):
+            self._drop(conn)
+
+        if self.sock is not None:
+            if self.selector is not None:
+                self.selector.unregister(self.sock)
+            self.sock.close()
+            self.sock = None
+
+        if self._owns_path:
+            try:
+                self.socket_path.unlink()
+            except OSError:
+                pass
+            self._owns_path = False
+
+    def _accept(self, sock: socket.socket):
+        """Accept pending connections and start reading from them"""
+        while True:
+            try:
+                conn, _ = sock.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+
+            conn.setblocking(False)
+            self._clients[conn] = b""
+            self.selector.register(conn, selectors.EVENT_READ, self._read)
+
+    def _read(self, conn: socket.socket):
+        """Read what a client has sent; reply once its commands are complete"""
+        try:
+            chunk = conn.recv(4096)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError as e:
+            logger.debug(f"Session client error: {e}")
+            self._drop(conn)
+            return
+
+        buffer = self._clients[conn] + chunk
+        self._clients[conn] = buffer
+
+        # Wait for more unless the client finished a line or hung up
+        if chunk and not buffer.endswith(b"\n") and len(buffer) <= 65536:
+            return
+
+        replies = [self.handle_command(line) for line in buffer.decode("utf-8", "ignore").splitlines()
+                   if line.strip()]
+        try:
+            # A few short lines always fit in the local socket buffer
+            conn.send("".join(reply + "\n" for reply in replies).encode())
+        except OSError as e:
+            logger.debug(f"Session client error: {e}")
+        self._drop(conn)
+
+    def _drop(self, conn: socket.socket):
+        """Forget and close a client connection"""
+        del self._clients[conn]
+        self.selector.unregister(conn)
+        conn.close()
+
+    def handle_command(self, line: str) -> str:
+        """
+        Apply one protocol command
+
+        Returns:
+            Reply line (without newline)
+        """
+        parts = line.split()
+        command, args = parts[0].lower(), parts[1:]
+
+        if command == "register" and 1 <= len(args) <= 2:
+            pid = None
+            if len(args) == 2:
+                try:
+                    pid = int(args[1])
+                except ValueError:
+                    return "error invalid pid"
+            self.sessions[args[0]] = pid
+            logger.info(f"Session registered: {args[0]} ({len(self.sessions)} active)")
+        elif command == "unregister" and len(args) == 1:
+            if args[0] in self.sessions:
+                del self.sessions[args[0]]
+                self._ended.append(args[0])
+                logger.info(f"Session ended: {args[0]} ({len(self.sessions)} active)")
+        elif command != "status":
+            return "error unknown command"
+
+        return f"ok {len(self.sessions)}"
+
+    def reap(self):
+        """Drop sessions whose owning process has exited"""
+        for terminal_id, pid in list(self.sessions.items()):
+            if pid is None:
+                continue
+            try:
+                os.kill(pid, 0)
+            except ProcessLookupError:
+                del self.sessions[terminal_id]
+                self._ended.append(terminal_id)
+                logger.info(f"Session process gone: {terminal_id} ({len(self.sessions)} active)")
+            except PermissionError:
+                pass  # Process exists but belongs to another user
+
+    def pop_ended(self) -> List[str]:
+        """Return terminal IDs of sessions ended since the last call"""
+        ended, self._ended = self._ended, []
+        return ended
+
+
+def send_command(socket_path: Path, command: str, timeout: float = 2) -> Optional[str]:
+    """
+    Send one command to a running on-demand daemon
+
+    Args:
+        socket_path: Daemon's session socket
+        command: Protocol line, e.g. "register term-123 4567"
+        timeout: Seconds to wait for a reply
+
+    Returns:
+        Reply line, or None if no daemon is listening
+    """
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(str(socket_path))
+            sock.sendall(command.encode() + b"\n")
+            return sock.makefile("r").readline().strip()
+    except OSError:
+        return None
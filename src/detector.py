@@ -5,10 +5,18 @@ Question detection logic for Claude Code output
 import re
 import json
 import logging
-from typing import Optional
+from typing import Iterator, List, Optional, Tuple, Union
 
 logger = logging.getLogger(__name__)
 
+TERM_PREFIX = re.compile(rb'\[TERM:([^\]]+)\]')
+
+# Every ASCII character str.strip() removes (bytes.strip() misses \x1c-\x1f)
+ASCII_WHITESPACE = b" \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f"
+
+# Anything detect_many() accepts: bytes, bytearray, memoryview, mmap, ...
+Buffer = Union[bytes, bytearray, memoryview]
+
 
 class QuestionDetector:
     """Detects AskUserQuestion tool calls in Claude output"""
@@ -27,6 +35,24 @@ class QuestionDetector:
         r'Questions to ask the user',
     ]
 
+    # Output that asks for input without being a question, e.g. permission
+    # prompts and plan approvals; only acted on if the session then goes quiet
+    PROMPT_PATTERNS = [
+        r'Do you want to (proceed|make this edit|create|run|allow)',
+        r'Would you like to proceed',
+        r'\((y/n|yes/no)\)|\[(y/N|Y/n)\]',
+        r'^[\s│|]*[❯>]\s*\d+\.\s',
+        r'(approve|reject|accept) (this|the) plan',
+        r'Press Enter|Esc to (cancel|exit)',
+    ]
+
+    # Rest of a prompt block: further menu options and box borders. These
+    # keep a prompt armed instead of counting as new output
+    PROMPT_CONTINUATION_PATTERNS = [
+        r'^[\s│|]*\d+\.\s',
+        r'^[\s│|╭╮╰╯─┌┐└┘├┤]+$',
+    ]
+
     def extract_terminal_id(self, line: str) -> Optional[str]:
         """
         Extract terminal ID from [TERM:xxx] prefix in log line
@@ -55,6 +81,13 @@ class QuestionDetector:
 
         return None
 
+    # Rule names reported by match_rule() besides the PATTERNS themselves
+    RULE_JSON = "json"
+    RULE_QUESTION = "question"
+
+    # Lowercase byte markers; every PATTERNS match contains one of them
+    MARKERS = (b"askuserquestion", b"questions to ask the user")
+
     def detect(self, line: str) -> bool:
         """
         Check if a line contains AskUserQuestion indicator or a question
@@ -62,8 +95,18 @@ class QuestionDetector:
         Returns:
             True if line indicates Claude is asking a question
         """
+        return self.match_rule(line) is not None
+
+    def match_rule(self, line: str) -> Optional[str]:
+        """
+        Find which detection rule a line matches
+
+        Returns:
+            The matching pattern from PATTERNS, RULE_JSON or RULE_QUESTION,
+            None if line is not a question
+        """
         if not line or not line.strip():
-            return False
+            return None
 
         # Strip [TERM:xxx] prefix if present for detection purposes
         # This allows the detector to work with terminal-tagged lines
@@ -73,7 +116,7 @@ class QuestionDetector:
         for pattern in self.PATTERNS:
             if re.search(pattern, cleaned_line, re.IGNORECASE | re.MULTILINE):
                 logger.debug(f"Detected pattern: {pattern}")
-                return True
+                return pattern
 
         # Try JSON parsing
         try:
@@ -83,7 +126,7 @@ class QuestionDetector:
                    data.get('name') == 'AskUserQuestion' or \
                    'AskUserQuestion' in str(data):
                     logger.debug("Detected via JSON parsing")
-                    return True
+                    return self.RULE_JSON
         except json.JSONDecodeError:
             pass
 
@@ -94,6 +137,136 @@ class QuestionDetector:
             # Skip lines that are just symbols or formatting
             if not re.match(r'^[>\-\*\s]+\?$', stripped):
                 logger.debug(f"Detected conversational question")
+                return self.RULE_QUESTION
+
+        return None
+
+    def detect_many(self, buffer: Buffer,
+                    block_size: int = 8 * 1024 * 1024) -> Iterator[Tuple[int, Optional[str], str]]:
+        """
+        Detect questions in a buffer of line-separated log output
+
+        Lines are located with bytes.find over large blocks: only lines that
+        contain a marker (see MARKERS, matched ASCII case-insensitively) or
+        end in '?' are decoded and checked with match_rule(); no other line
+        becomes a str. Lines end at "\\n", "\\r" or "\\r\\n", as when the
+        log is read in text mode. Results match detect() on each line
+        decoded as UTF-8 (errors ignored), except for markers that only
+        appear JSON-escaped (e.g. "\\u0041skUserQuestion") or spelled with
+        non-ASCII case variants. A trailing line without newline is treated
+        as a complete line, so streaming callers should pass buffers cut at
+        a newline.
+
+        Args:
+            buffer: bytes-like object (bytes, bytearray, memoryview, mmap)
+            block_size: Bytes copied and scanned at a time
+
+        Yields:
+            (offset of line start in buffer, terminal_id or None, rule) per
+            detected line, in order
+
+        Example:
+            >>> detector = QuestionDetector()
+            >>> list(detector.detect_many(b"[TERM:t1] hi\\n[TERM:t1] Shall I proceed?\\n"))
+            [(13, 't1', 'question')]
+        """
+        with memoryview(buffer) as view:
+            end = view.nbytes
+            start = 0
+            carry = b""
+
+            while start < end:
+                chunk = bytes(view[start:start + block_size])
+                block_offset = start - len(carry)
+                block = carry + chunk if carry else chunk
+                start += len(chunk)
+
+                # Hold back the partial last line until the next block
+                if start < end:
+                    cut = max(block.rfind(b"\n"), block.rfind(b"\r")) + 1
+                    carry, block = block[cut:], block[:cut]
+                else:
+                    carry = b""
+
+                for line_start, line_end in self._candidate_spans(block):
+                    raw = block[line_start:line_end]
+                    rule = self.match_rule(raw.decode('utf-8', errors='ignore'))
+                    if rule is not None:
+                        match = TERM_PREFIX.search(raw)
+                        terminal_id = match.group(1).decode('utf-8', errors='ignore') if match else None
+                        yield block_offset + line_start, terminal_id, rule
+
+    def _candidate_spans(self, block: bytes) -> List[Tuple[int, int]]:
+        """Return sorted (start, end) spans of lines in block that may be questions"""
+        spans = {}
+        has_cr = b"\r" in block
+
+        def line_end_at(pos: int) -> int:
+            line_end = block.find(b"\n", pos)
+            if line_end == -1:
+                line_end = len(block)
+            if has_cr:
+                # Searched within the \n-line only, so sparse \r stays cheap
+                cr = block.find(b"\r", pos, line_end)
+                if cr != -1:
+                    line_end = cr
+            return line_end
+
+        def add(pos: int) -> int:
+            line_start = block.rfind(b"\n", 0, pos) + 1
+            if has_cr:
+                line_start = max(line_start, block.rfind(b"\r", line_start, pos) + 1)
+            line_end = line_end_at(pos)
+            spans[line_start] = line_end
+            return line_end
+
+        lowered = block.lower()
+        for marker in self.MARKERS:
+            pos = lowered.find(marker)
+            while pos != -1:
+                pos = lowered.find(marker, add(pos))
+
+        pos = block.find(b"?")
+        while pos != -1:
+            line_end = line_end_at(pos)
+            # Only a trailing '?' makes a question. A non-ASCII tail after the
+            # last '?' is decoded so Unicode whitespace (e.g. NBSP) is
+            # stripped the same way str.strip() does in match_rule()
+            last = block.rfind(b"?", pos, line_end)
+            tail = block[last + 1:line_end].strip(ASCII_WHITESPACE)
+            if not tail or (not tail.isascii() and
+                            not tail.decode('utf-8', errors='ignore').strip()):
+                add(pos)
+            pos = block.find(b"?", line_end)
+
+        return sorted(spans.items())
+
+    def is_prompt_like(self, line: str) -> bool:
+        """
+        Check if a line looks like a prompt waiting for the user
+
+        Returns:
+            True if line matches one of PROMPT_PATTERNS
+        """
+        cleaned_line = re.sub(r'\[TERM:[^\]]+\]\s*', '', line)
+
+        for pattern in self.PROMPT_PATTERNS:
+            if re.search(pattern, cleaned_line, re.IGNORECASE):
+                return True
+
+        return False
+
+    def is_prompt_continuation(self, line: str) -> bool:
+        """
+        Check if a line may continue a prompt block (menu option or border)
+
+        Returns:
+            True if line matches one of PROMPT_CONTINUATION_PATTERNS
+        """
+        cleaned_line = re.sub(r'\[TERM:[^\]]+\]\s*', '', line)
+
+        for pattern in self.PROMPT_CONTINUATION_PATTERNS:
+            if re.search(pattern, cleaned_line):
                 return True
 
         return False
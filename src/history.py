@@ -0,0 +1,212 @@
+"""
+Detection history journal backed by SQLite
+"""
+
+import re
+import time
+import queue
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+HISTORY_FILE = "history.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    kind TEXT NOT NULL,
+    terminal_id TEXT,
+    detail TEXT,
+    wait REAL
+);
+CREATE INDEX IF NOT EXISTS events_terminal_ts ON events (terminal_id, ts);
+-- Covers the summary query, so time-range scans never touch the table
+CREATE INDEX IF NOT EXISTS events_ts ON events (ts, terminal_id, kind, wait);
+"""
+
+Event = Tuple[float, str, Optional[str], Optional[str], Optional[float]]
+
+
+class HistoryStore:
+    """Event journal of detections, notifications and focus actions
+
+    record() only enqueues; a writer thread inserts whatever has queued up
+    in one transaction, so the daemon loop never waits on disk. The writer
+    blocks on the queue with no timeout, and pruning of events older than
+    the retention period piggybacks on writes, so an idle daemon stays idle.
+
+    Event kinds:
+        detection     detail is the signal type ("question" or "idle")
+        notification  detail is the signal type
+        focus         detail is "ok" or "failed"
+        resumed       first output after a detection; wait is seconds waited
+    """
+
+    PRUNE_INTERVAL = 3600  # seconds between retention pruning passes
+    BATCH_SIZE = 500
+
+    def __init__(self, db_path: Path, retention_days: float = 30):
+        """
+        Initialize history store and start writer thread
+
+        Args:
+            db_path: SQLite database file
+            retention_days: Events older than this are pruned (0 keeps all)
+        """
+        self.db_path = db_path
+        self.retention_days = retention_days
+        self._queue: "queue.Queue[Optional[Event]]" = queue.Queue()
+        self._last_prune = 0.0
+        self._failed = False
+
+        self._thread = threading.Thread(target=self._writer, name="nudge-history", daemon=True)
+        self._thread.start()
+
+    def record(self, kind: str, terminal_id: Optional[str] = None,
+               detail: Optional[str] = None, wait: Optional[float] = None):
+        """Queue an event for insertion"""
+        if self._failed:
+            return
+        self._queue.put((time.time(), kind, terminal_id, detail, wait))
+
+    def close(self):
+        """Flush queued events and stop writer thread"""
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+    def _writer(self):
+        try:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = connect(self.db_path)
+        except (OSError, sqlite3.Error) as e:
+            logger.error(f"History disabled, cannot open {self.db_path}: {e}")
+            self._failed = True
+            return
+
+        with conn:
+            self._prune(conn)
+
+        stopping = False
+        while not stopping:
+            batch = [self._queue.get()]
+            while len(batch) < self.BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            if None in batch:
+                stopping = True
+                batch = [event for event in batch if event is not None]
+
+            try:
+                with conn:
+                    conn.executemany(
+                        "INSERT INTO events (ts, kind, terminal_id, detail, wait) VALUES (?, ?, ?, ?, ?)",
+                        batch
+                    )
+                    if time.monotonic() - self._last_prune >= self.PRUNE_INTERVAL:
+                        self._prune(conn)
+            except sqlite3.Error as e:
+                logger.error(f"Failed to write history: {e}")
+
+        conn.close()
+
+    def _prune(self, conn: sqlite3.Connection):
+        """Delete events older than the retention period"""
+        self._last_prune = time.monotonic()
+        if not self.retention_days:
+            return
+
+        cutoff = time.time() - self.retention_days * 86400
+        deleted = conn.execute("DELETE FROM events WHERE ts < ?", (cutoff,)).rowcount
+        if deleted:
+            logger.info(f"Pruned {deleted} history events older than {self.retention_days} days")
+
+
+def connect(db_path: Path) -> sqlite3.Connection:
+    """Open history database in WAL mode, creating schema if needed"""
+    conn = sqlite3.connect(str(db_path))
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def parse_time(value: str, now: Optional[datetime] = None) -> float:
+    """
+    Parse a history time bound
+
+    Args:
+        value: "today", a relative age like "30m", "6h", "7d", or an ISO date/time
+        now: Reference time (defaults to current time)
+
+    Returns:
+        Unix timestamp
+
+    Raises:
+        ValueError: If value cannot be parsed
+    """
+    now = now or datetime.now()
+
+    if value == "today":
+        return now.replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+
+    match = re.fullmatch(r'(\d+(?:\.\d+)?)([mhd])', value)
+    if match:
+        unit = {"m": "minutes", "h": "hours", "d": "days"}[match.group(2)]
+        return (now - timedelta(**{unit: float(match.group(1))})).timestamp()
+
+    return datetime.fromisoformat(value).timestamp()
+
+
+def query_summary(conn: sqlite3.Connection, since: float, until: float) -> List[tuple]:
+    """
+    Per-terminal totals for a time range
+
+    "Questions" counts every detection, i.e. idle (quiescence) detections
+    as well as questions proper.
+
+    Returns:
+        Rows of (terminal_id, questions, notifications, avg wait, max wait, last question ts)
+    """
+    return conn.execute(
+        """
+        SELECT terminal_id,
+               SUM(kind = 'detection'),
+               SUM(kind = 'notification'),
+               AVG(CASE WHEN kind = 'resumed' THEN wait END),
+               MAX(CASE WHEN kind = 'resumed' THEN wait END),
+               MAX(CASE WHEN kind = 'detection' THEN ts END)
+        FROM events INDEXED BY events_ts
+        WHERE ts >= ? AND ts < ?
+        GROUP BY terminal_id
+        ORDER BY 6 DESC
+        """,
+        (since, until)
+    ).fetchall()
+
+
+def query_terminal(conn: sqlite3.Connection, terminal_id: str,
+                   since: float, until: float) -> List[tuple]:
+    """
+    Events of one terminal in a time range
+
+    Returns:
+        Rows of (ts, kind, detail, wait), oldest first
+    """
+    return conn.execute(
+        """
+        SELECT ts, kind, detail, wait
+        FROM events INDEXED BY events_terminal_ts
+        WHERE terminal_id = ? AND ts >= ? AND ts < ?
+        ORDER BY ts
+        """,
+        (terminal_id, since, until)
+    ).fetchall()
@@ -12,6 +12,12 @@ logger = logging.getLogger(__name__)
 # Path to terminal-notifier binary
 TERMINAL_NOTIFIER = "/opt/homebrew/bin/terminal-notifier"
 
+# Notification message per detection signal
+MESSAGES = {
+    "question": "Claude has asked a question",
+    "idle": "Claude is waiting for your input",
+}
+
 
 class NotificationManager:
     """Sends macOS notifications when Claude asks questions"""
@@ -27,13 +33,15 @@ class NotificationManager:
         self.notification_sent = False
         self.last_terminal_id: Optional[str] = None
 
-    def send_notification(self, terminal_id: Optional[str] = None) -> bool:
+    def send_notification(self, terminal_id: Optional[str] = None,
+                          signal_type: str = "question") -> bool:
         """
         Send notification to macOS notification center (top-right corner)
 
         Args:
             terminal_id: Terminal identifier for grouping notifications (e.g., term-1762552270-33202-29167).
                         If provided, notifications will be grouped by terminal session.
+            signal_type: Detection signal that triggered it ("question" or "idle")
 
         Returns:
             True if notification sent successfully
@@ -49,7 +57,7 @@ class NotificationManager:
                 TERMINAL_NOTIFIER,
                 "-title", "Claude Code",
                 "-subtitle", "Click to view terminal",
-                "-message", "Claude has asked a question",
+                "-message", MESSAGES.get(signal_type, MESSAGES["question"]),
                 "-actions", "View",
                 "-sound", "Glass",  # Add sound to make it more noticeable
                 "-ignoreDnD",  # Bypass Do Not Disturb
@@ -68,7 +76,7 @@ class NotificationManager:
             )
 
             if result.returncode == 0:
-                logger.info(f"Notification sent successfully (notification center){' for terminal ' + terminal_id if terminal_id else ''}")
+                logger.info(f"Notification sent successfully (notification center, {signal_type}){' for terminal ' + terminal_id if terminal_id else ''}")
                 self.notification_sent = True
                 return True
             else:
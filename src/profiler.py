@@ -0,0 +1,233 @@
+"""
+Self-profiling for the daemon loop
+"""
+
+import cProfile
+import io
+import logging
+import pstats
+import time
+import tracemalloc
+from functools import wraps
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Files in the config directory used to request and deliver a profile
+PROFILE_REQUEST = "profile.request"
+PROFILE_REPORT = "profile.txt"
+
+PHASES = ("stat", "read", "detect", "dispatch")
+
+
+class DaemonProfiler:
+    """Samples the daemon loop with cProfile and tracemalloc, split by phase
+
+    Every hooked call is charged its time and net traced memory, which is
+    cheap. Allocation sites need full tracemalloc snapshots, so only the
+    first call of each phase per loop iteration (see tick()) is diffed;
+    its sites include those of phases nested inside it. Phase hooks are attached as instance attributes that shadow the daemon's
+    methods and are deleted again on stop(), so when no profile is running
+    the loop calls the plain class methods and pays nothing.
+    """
+
+    # (phase, daemon attribute holding the object or None for the daemon, method)
+    HOOKS = [
+        ("stat", "config", "get_log_paths"),
+        ("stat", None, "_stat_log"),
+        ("read", None, "_process_log_file"),
+        ("detect", "detector", "match_rule"),
+        ("detect", "detector", "extract_terminal_id"),
+        ("detect", "detector", "should_ignore_line"),
+        ("detect", "detector", "is_prompt_like"),
+        ("detect", "detector", "is_prompt_continuation"),
+        ("dispatch", "notifier", "send_notification"),
+        ("dispatch", "notifier", "focus_ide"),
+    ]
+
+    def __init__(self, daemon, duration: float, report_path: Path, top: int = 15):
+        """
+        Initialize profiler
+
+        Args:
+            daemon: ClaudeMonitorDaemon instance to profile
+            duration: Seconds to profile before writing the report
+            report_path: Where the report is written
+            top: Number of functions / allocation sites listed per section
+        """
+        self.daemon = daemon
+        self.duration = duration
+        self.report_path = report_path
+        self.top = top
+
+        self.profiles: Dict[str, cProfile.Profile] = {p: cProfile.Profile() for p in PHASES}
+        self.calls: Dict[str, int] = {p: 0 for p in PHASES}
+        self.seconds: Dict[str, float] = {p: 0.0 for p in PHASES}
+        self.allocated: Dict[str, int] = {p: 0 for p in PHASES}
+        # Per phase: bytes allocated (and still alive at the phase boundary)
+        # by each "file:line" site
+        self.sites: Dict[str, Dict[str, int]] = {p: {} for p in PHASES}
+
+        self.started_at: Optional[float] = None
+        # Active phases, each with its start snapshot if its sites are sampled
+        self._stack: List[Tuple[str, Optional[tracemalloc.Snapshot]]] = []
+        self._sampled: Set[str] = set()
+        self._mark: Tuple[float, int] = (0.0, 0)
+        # (object, method name, instance attribute the hook shadows)
+        self._installed: List[Tuple[object, str, Optional[object]]] = []
+        self._owns_tracemalloc = False
+
+    @property
+    def expired(self) -> bool:
+        """Check if the requested duration has elapsed"""
+        return self.started_at is not None and \
+            time.monotonic() - self.started_at >= self.duration
+
+    def start(self):
+        """Install phase hooks and start sampling"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracemalloc = True
+
+        for phase, attr, name in self.HOOKS:
+            target = getattr(self.daemon, attr) if attr else self.daemon
+            self._installed.append((target, name, vars(target).get(name)))
+            setattr(target, name, self._wrap(phase, getattr(target, name)))
+
+        self.started_at = time.monotonic()
+        logger.info(f"Profiling daemon loop for {self.duration:g}s")
+
+    def tick(self):
+        """Mark the start of a loop iteration; each phase is site-sampled again"""
+        self._sampled.clear()
+
+    def stop(self) -> Path:
+        """
+        Remove phase hooks and write the report
+
+        Returns:
+            Path of the written report
+        """
+        for target, name, shadowed in reversed(self._installed):
+            # Deleting the instance attribute re-exposes the class method
+            if shadowed is None:
+                delattr(target, name)
+            else:
+                setattr(target, name, shadowed)
+        self._installed = []
+
+        elapsed = time.monotonic() - (self.started_at or time.monotonic())
+        self._stack = []
+        if self._owns_tracemalloc:
+            tracemalloc.stop()
+
+        report = self._format_report(elapsed)
+
+        # Write atomically so `nudge profile` never reads a partial report
+        tmp_path = self.report_path.with_suffix(".tmp")
+        tmp_path.write_text(report)
+        tmp_path.replace(self.report_path)
+
+        logger.info(f"Profile report written to {self.report_path}")
+        return self.report_path
+
+    def _wrap(self, phase: str, func):
+        """Wrap a bound method so its time and allocations count toward phase"""
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            self._enter(phase)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._exit()
+        return wrapper
+
+    def _take_snapshot(self) -> tracemalloc.Snapshot:
+        """Snapshot traced memory, excluding the profiler's own bookkeeping"""
+        return tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ])
+
+    def _set_mark(self):
+        """Start measuring time and memory from here"""
+        self._mark = (time.perf_counter(), tracemalloc.get_traced_memory()[0])
+
+    def _account(self, phase: str):
+        """Charge time and memory since the last mark to phase"""
+        now = time.perf_counter()
+        memory = tracemalloc.get_traced_memory()[0]
+        self.seconds[phase] += now - self._mark[0]
+        self.allocated[phase] += memory - self._mark[1]
+
+    def _add_sites(self, phase: str, before: tracemalloc.Snapshot):
+        """Charge per-site growth since the before snapshot to phase"""
+        sites = self.sites[phase]
+        for stat in self._take_snapshot().compare_to(before, "lineno"):
+            if stat.size_diff > 0:
+                frame = stat.traceback[0]
+                site = f"{frame.filename}:{frame.lineno}"
+                sites[site] = sites.get(site, 0) + stat.size_diff
+
+    def _enter(self, phase: str):
+        # Only one profiler can be active at a time, and nested phases are
+        # reported exclusively, so the outer phase is paused while inside
+        if self._stack:
+            outer = self._stack[-1][0]
+            self.profiles[outer].disable()
+            self._account(outer)
+
+        snapshot = None
+        if phase not in self._sampled:
+            self._sampled.add(phase)
+            snapshot = self._take_snapshot()
+
+        # Marked after the snapshot, so snapshotting is charged to no phase
+        self._set_mark()
+        self._stack.append((phase, snapshot))
+        self.calls[phase] += 1
+        self.profiles[phase].enable()
+
+    def _exit(self):
+        phase, snapshot = self._stack.pop()
+        self.profiles[phase].disable()
+        self._account(phase)
+
+        if snapshot is not None:
+            self._add_sites(phase, snapshot)
+            del snapshot
+
+        self._set_mark()
+        if self._stack:
+            self.profiles[self._stack[-1][0]].enable()
+
+    def _format_report(self, elapsed: float) -> str:
+        """Render per-phase summary, top functions and top allocation sites"""
+        out = io.StringIO()
+        out.write(f"Nudge daemon profile ({elapsed:.1f}s sampled)\n\n")
+
+        out.write(f"{'phase':<10}{'calls':>10}{'seconds':>12}{'net KiB':>12}\n")
+        for phase in PHASES:
+            out.write(
+                f"{phase:<10}{self.calls[phase]:>10}"
+                f"{self.seconds[phase]:>12.4f}{self.allocated[phase] / 1024:>12.1f}\n"
+            )
+
+        for phase in PHASES:
+            out.write(f"\n=== {phase}: top functions by time ===\n")
+            if not self.calls[phase]:
+                out.write("(no calls)\n")
+                continue
+            stats = pstats.Stats(self.profiles[phase], stream=out)
+            stats.sort_stats("tottime").print_stats(self.top)
+
+        for phase in PHASES:
+            out.write(f"\n=== {phase}: top allocation sites (sampled, incl. nested) ===\n")
+            sites = sorted(self.sites[phase].items(), key=lambda item: item[1], reverse=True)
+            if not sites:
+                out.write("(no allocations)\n")
+            for site, size in sites[:self.top]:
+                out.write(f"{size / 1024:>10.1f} KiB  {site}\n")
+
+        return out.getvalue()
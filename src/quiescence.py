@@ -0,0 +1,97 @@
+"""
+Output-quiescence detection: sessions that go silent after prompt-like output
+"""
+
+import heapq
+import logging
+from typing import Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class QuiescenceTracker:
+    """Per-terminal silence deadlines kept in a min-heap
+
+    A terminal is armed when its latest output line is prompt-like and
+    disarmed by any other output (callers report the rest of a multi-line
+    prompt as prompt-like). Each line only updates a dict entry; the
+    heap holds at most one entry per terminal and stale entries are
+    re-pushed with the current deadline when they surface, so the cost per
+    output line is O(1) and nothing polls individual sessions.
+    """
+
+    def __init__(self, timeout: float):
+        """
+        Initialize tracker
+
+        Args:
+            timeout: Seconds of silence after prompt-like output before a
+                     terminal counts as waiting for input
+        """
+        self.timeout = timeout
+        self.deadlines: Dict[Optional[str], float] = {}
+        self._heap: List[Tuple[float, int, Optional[str]]] = []
+        self._scheduled: Set[Optional[str]] = set()
+        self._counter = 0  # tie-breaker so terminal IDs are never compared
+
+    def observe(self, terminal_id: Optional[str], prompt_like: bool, now: float):
+        """
+        Record an output line from a terminal
+
+        Args:
+            terminal_id: Terminal the line came from (None if untagged)
+            prompt_like: Whether the line looks like a prompt for input
+            now: Current monotonic time
+        """
+        if not prompt_like:
+            self.deadlines.pop(terminal_id, None)
+            return
+
+        deadline = now + self.timeout
+        self.deadlines[terminal_id] = deadline
+
+        if terminal_id not in self._scheduled:
+            self._push(deadline, terminal_id)
+
+    def is_armed(self, terminal_id: Optional[str]) -> bool:
+        """Check if terminal's latest output was prompt-like"""
+        return terminal_id in self.deadlines
+
+    def next_deadline(self) -> Optional[float]:
+        """Earliest scheduled deadline (may be stale and later re-armed)"""
+        return self._heap[0][0] if self._heap else None
+
+    def expired(self, now: float, limit: Optional[int] = None) -> List[Optional[str]]:
+        """
+        Pop terminals that have been silent past their deadline
+
+        Args:
+            now: Current monotonic time
+            limit: Pop at most this many; the rest stay armed for later calls
+
+        Returns:
+            Terminal IDs now considered waiting for input, earliest first
+        """
+        waiting = []
+
+        while self._heap and self._heap[0][0] <= now and \
+                (limit is None or len(waiting) < limit):
+            _, _, terminal_id = heapq.heappop(self._heap)
+            self._scheduled.discard(terminal_id)
+
+            deadline = self.deadlines.get(terminal_id)
+            if deadline is None:
+                continue  # Disarmed by later output
+            if deadline > now:
+                self._push(deadline, terminal_id)  # Re-armed by later prompt
+                continue
+
+            del self.deadlines[terminal_id]
+            waiting.append(terminal_id)
+
+        return waiting
+
+    def _push(self, deadline: float, terminal_id: Optional[str]):
+        self._counter += 1
+        heapq.heappush(self._heap, (deadline, self._counter, terminal_id))
+        self._scheduled.add(terminal_id)
@@ -0,0 +1,61 @@
+"""
+Bulk scanning of large unread log regions
+"""
+
+import mmap
+import logging
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from src.detector import QuestionDetector
+
+logger = logging.getLogger(__name__)
+
+
+class BacklogScanner:
+    """Finds question lines in a memory-mapped log without decoding every line
+
+    The unread region is handed to QuestionDetector.detect_many() as a
+    zero-copy view of the mapping, so only candidate lines are ever decoded.
+    """
+
+    def __init__(self, detector: QuestionDetector = None, block_size: int = 8 * 1024 * 1024):
+        """
+        Initialize scanner
+
+        Args:
+            detector: Detector to scan with (creates one if not provided)
+            block_size: Bytes scanned per block
+        """
+        self.detector = detector or QuestionDetector()
+        self.block_size = block_size
+
+    def scan_file(self, log_path: Path, start: int) -> Tuple[List[Tuple[int, Optional[str], str]], int]:
+        """
+        Scan a log file from start to the end of its last complete line
+
+        A partial last line may still be being written, so it is left
+        unread for the next scan.
+
+        Args:
+            log_path: Log file to scan
+            start: Byte offset of the first unread byte
+
+        Returns:
+            (list of (offset, terminal_id, rule) for detected questions, end offset)
+        """
+        with open(log_path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                end = max(mm.rfind(b"\n", start), mm.rfind(b"\r", start)) + 1
+                if end == 0:
+                    return [], start
+
+                # The view must be released before the mapping can close
+                with memoryview(mm) as view:
+                    detections = [
+                        (start + offset, terminal_id, rule)
+                        for offset, terminal_id, rule
+                        in self.detector.detect_many(view[start:end], self.block_size)
+                    ]
+
+                return detections, end
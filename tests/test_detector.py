@@ -0,0 +1,69 @@
+"""
+Tests for QuestionDetector.detect_many against per-line detect()
+"""
+
+import re
+
+import pytest
+
+from src.detector import QuestionDetector
+
+LINES = [
+    "[TERM:a] plain output",
+    "[TERM:a] Shall I proceed?",
+    "[TERM:b] Shall I proceed?\xa0",
+    "[TERM:b] Shall I proceed? ",
+    "[TERM:b] Shall I proceed?\x85",
+    "[TERM:b] Shall I proceed?\x1c",
+    "[TERM:b] Shall I proceed?  \r",
+    "[TERM:c] what? no",
+    "[TERM:c] first? second?",
+    "[TERM:c] ?",
+    "",
+    "   ",
+    '[TERM:d] {"tool": "AskUserQuestion", "input": {}}',
+    '[TERM:d] <invoke name="askuserquestion">',
+    "[TERM:d] Questions to ask the user: none",
+    "no terminal prefix, still a question?",
+    "[TERM:e] ünïcödé output ❯ 1. Yes",
+    "[TERM:e] ünïcödé question?",
+    "[TERM:f] Shall I proceed with the refactor?\r[TERM:f] \u280b Thinking",
+    "[TERM:f] \u280b Thinking\r[TERM:f] Shall I proceed?\r\r",
+    "[TERM:f] redraw\rShall I?\rok",
+]
+
+
+def per_line(data: bytes):
+    """Reference results: detect() on each line, split like text-mode reads"""
+    detector = QuestionDetector()
+    results = []
+    for match in re.finditer(rb"[^\r\n]*(?:\r\n|\r|\n|$)", data):
+        line = match.group().decode("utf-8", errors="ignore")
+        if detector.detect(line):
+            results.append((match.start(), detector.extract_terminal_id(line), detector.match_rule(line)))
+    return results
+
+
+@pytest.mark.parametrize("block_size", [1, 7, 64, 8 * 1024 * 1024])
+def test_detect_many_matches_detect(block_size):
+    data = "\n".join(LINES * 3).encode() + b"\n"
+
+    found = list(QuestionDetector().detect_many(data, block_size=block_size))
+
+    assert found == per_line(data)
+    assert len(found) == 3 * 15
+
+
+def test_detect_many_accepts_buffers():
+    data = "\n".join(LINES).encode()
+    detector = QuestionDetector()
+    expected = per_line(data)
+
+    assert list(detector.detect_many(bytearray(data))) == expected
+    assert list(detector.detect_many(memoryview(data))) == expected
+
+
+def test_detect_many_reports_rule_and_offset():
+    found = list(QuestionDetector().detect_many(b"[TERM:t1] hi\n[TERM:t1] Shall I proceed?\n"))
+
+    assert found == [(13, "t1", QuestionDetector.RULE_QUESTION)]
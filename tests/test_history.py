@@ -0,0 +1,67 @@
+"""
+Tests for the detection history journal
+"""
+
+from datetime import datetime
+
+from src.config import Config
+from src.daemon import ClaudeMonitorDaemon
+from src.history import HistoryStore, connect, parse_time, query_summary
+
+
+def make_daemon(tmp_path, retention_days=30):
+    config = Config(tmp_path / "config.toml")
+    config.data["paths"] = {"log_dirs": [], "manual_log": str(tmp_path / "claude.log")}
+    config.data["history"] = {"enabled": True, "retention_days": retention_days}
+    return ClaudeMonitorDaemon(config)
+
+
+def test_parse_time():
+    now = datetime(2026, 10, 19, 15, 30)
+
+    assert parse_time("today", now) == datetime(2026, 10, 19).timestamp()
+    assert parse_time("6h", now) == datetime(2026, 10, 19, 9, 30).timestamp()
+    assert parse_time("2026-10-01", now) == datetime(2026, 10, 1).timestamp()
+
+
+def test_events_are_journaled(tmp_path):
+    store = HistoryStore(tmp_path / "history.db")
+    store.record("detection", "a", "question")
+    store.record("resumed", "a", wait=4.0)
+    store.close()
+
+    conn = connect(tmp_path / "history.db")
+    (row,) = query_summary(conn, 0, 2 ** 40)
+    assert row[:5] == ("a", 1, 0, 4.0, 4.0)
+
+
+def test_bulk_detections_start_a_wait(tmp_path):
+    daemon = make_daemon(tmp_path)
+    log = tmp_path / "claude.log"
+    log.write_text("[TERM:a] Shall I go ahead?\n")
+
+    daemon._scan_backlog(log, 0)
+    daemon.stop()
+
+    assert "a" in daemon._awaiting
+
+
+def test_ended_session_stops_waiting(tmp_path):
+    daemon = make_daemon(tmp_path)
+    daemon._record_detection("a", "question", now=0)
+
+    daemon._end_session("a")
+    daemon.stop()
+
+    assert daemon._awaiting == {}
+
+
+def test_unanswered_waits_expire_after_retention(tmp_path):
+    daemon = make_daemon(tmp_path, retention_days=1)
+    daemon._awaiting_pruned_at = 0
+    daemon._record_detection("old", "question", now=0)
+
+    daemon._record_detection("new", "question", now=2 * 86400)
+    daemon.stop()
+
+    assert list(daemon._awaiting) == ["new"]
@@ -0,0 +1,84 @@
+"""
+Tests for daemon self-profiling
+"""
+
+import os
+import time
+import tracemalloc
+
+from src.config import Config
+from src.daemon import ClaudeMonitorDaemon, PID_FILE, process_start_time, read_daemon_pid
+from src.profiler import DaemonProfiler
+
+
+def make_daemon(tmp_path):
+    log = tmp_path / "claude.log"
+    log.write_text("")
+
+    config = Config(tmp_path / "config.toml")
+    config.data["paths"] = {"log_dirs": [], "manual_log": str(log)}
+    config.data["history"] = {"enabled": False}
+    daemon = ClaudeMonitorDaemon(config)
+    daemon.notifier.send_notification = lambda terminal_id=None, signal_type="question": False
+    return daemon, log
+
+
+def test_report_is_written_on_time_under_log_traffic(tmp_path):
+    daemon, log = make_daemon(tmp_path)
+    daemon._profile_request = 1.0
+
+    started = time.monotonic()
+    daemon._update_profiler()
+    while daemon.profiler is not None and time.monotonic() - started < 30:
+        with open(log, "a") as f:
+            f.writelines(f"[TERM:a] compiling module {i}\n" for i in range(500))
+        daemon.check_logs()
+        daemon._update_profiler()
+    elapsed = time.monotonic() - started
+
+    assert daemon.profiler is None
+    assert elapsed < 3
+    report = (tmp_path / "profile.txt").read_text()
+    assert "=== detect: top allocation sites" in report
+
+
+def test_stop_removes_hooks_and_writes_report(tmp_path):
+    daemon, log = make_daemon(tmp_path)
+    log.write_text("[TERM:a] Shall I proceed?\n")
+    report_path = tmp_path / "profile.txt"
+
+    targets = [(getattr(daemon, attr) if attr else daemon, name)
+               for _, attr, name in DaemonProfiler.HOOKS]
+    before = [vars(target).get(name) for target, name in targets]
+
+    profiler = DaemonProfiler(daemon, 60, report_path)
+    profiler.start()
+    assert "_process_log_file" in vars(daemon)
+    assert "match_rule" in vars(daemon.detector)
+
+    daemon.check_logs()
+    profiler.stop()
+
+    # No wrapper is left behind, so an idle loop pays nothing
+    assert [vars(target).get(name) for target, name in targets] == before
+    assert "_process_log_file" not in vars(daemon)
+    assert not tracemalloc.is_tracing()
+
+    report = report_path.read_text()
+    assert profiler.calls["read"] == 1
+    assert "=== read: top functions by time ===" in report
+
+
+def test_read_daemon_pid_checks_start_time(tmp_path):
+    pid = os.getpid()
+    pid_path = tmp_path / PID_FILE
+
+    pid_path.write_text(f"{pid}\n{process_start_time(pid)}\n")
+    assert read_daemon_pid(tmp_path) == pid
+
+    # Same PID, different process: e.g. reused after the daemon crashed
+    pid_path.write_text(f"{pid}\nThu Jan  1 00:00:00 1970\n")
+    assert read_daemon_pid(tmp_path) is None
+
+    pid_path.write_text(f"{pid}\n")
+    assert read_daemon_pid(tmp_path) is None
@@ -0,0 +1,148 @@
+"""
+Tests for output-quiescence detection
+"""
+
+import pytest
+
+from src.config import Config
+from src.daemon import ClaudeMonitorDaemon
+from src.quiescence import QuiescenceTracker
+
+
+def test_prompt_then_silence_expires():
+    tracker = QuiescenceTracker(timeout=5)
+    tracker.observe("a", True, now=0)
+
+    assert tracker.expired(4.9) == []
+    assert tracker.expired(5) == ["a"]
+    assert tracker.deadlines == {}
+
+
+def test_later_output_disarms():
+    tracker = QuiescenceTracker(timeout=5)
+    tracker.observe("a", True, now=0)
+    tracker.observe("a", False, now=1)
+
+    assert tracker.expired(10) == []
+    assert tracker.next_deadline() is None
+
+
+def test_later_prompt_rearms_without_extra_heap_entry():
+    tracker = QuiescenceTracker(timeout=5)
+    tracker.observe("a", True, now=0)
+    tracker.observe("a", True, now=3)
+
+    assert len(tracker._heap) == 1
+    assert tracker.expired(5) == []  # Stale entry is re-pushed at 8
+    assert tracker.next_deadline() == 8
+    assert tracker.expired(8) == ["a"]
+
+
+def test_disarm_then_rearm_uses_latest_deadline():
+    tracker = QuiescenceTracker(timeout=5)
+    tracker.observe("a", True, now=0)
+    tracker.observe("a", False, now=1)
+    tracker.observe("a", True, now=2)
+
+    assert tracker.expired(5) == []
+    assert tracker.expired(7) == ["a"]
+
+
+def test_limit_keeps_remaining_terminals_armed():
+    tracker = QuiescenceTracker(timeout=5)
+    tracker.observe("a", True, now=0)
+    tracker.observe("b", True, now=1)
+
+    assert tracker.expired(10, limit=1) == ["a"]
+    assert tracker.next_deadline() == 6
+    assert tracker.expired(10, limit=1) == ["b"]
+
+
+def test_cooldown_does_not_drop_expired_terminals(tmp_path, monkeypatch):
+    log = tmp_path / "claude.log"
+    log.write_text("[TERM:a] Do you want to proceed\n[TERM:b] Do you want to proceed\n")
+
+    config = Config(tmp_path / "config.toml")
+    config.data["paths"] = {"log_dirs": [], "manual_log": str(log)}
+    config.data["history"] = {"enabled": False}
+    config.data["daemon"] = dict(config.data["daemon"], quiescence_timeout=1)
+
+    daemon = ClaudeMonitorDaemon(config)
+    sent = []
+    monkeypatch.setattr(daemon.notifier, "send_notification",
+                        lambda terminal_id=None, signal_type="question": sent.append(terminal_id) or True)
+    monkeypatch.setattr(daemon.notifier, "focus_ide", lambda terminal_id=None: True)
+    monkeypatch.setattr("src.daemon.time.sleep", lambda seconds: None)
+
+    clock = [100.0]
+    monkeypatch.setattr("src.daemon.time.monotonic", lambda: clock[0])
+
+    daemon.check_logs()
+    clock[0] += 2
+    daemon.check_logs()
+    assert sent == ["a"]
+
+    # Still in cooldown: b must stay armed rather than be dropped
+    daemon.check_logs()
+    assert sent == ["a"]
+    assert "b" in daemon.quiescence.deadlines
+
+    daemon.last_notification = None
+    daemon.check_logs()
+    assert sent == ["a", "b"]
+
+
+PERMISSION_PROMPT = """\
+╭───────────────────────────────────────────────────────────────╮
+│ Edit file                                                     │
+│ src/cli.py                                                    │
+│ Do you want to make this edit to cli.py?                      │
+│ ❯ 1. Yes                                                      │
+│   2. Yes, and don't ask again this session (shift+tab)        │
+│   3. No, and tell Claude what to do differently (esc)         │
+╰───────────────────────────────────────────────────────────────╯
+"""
+
+PLAN_APPROVAL_PROMPT = """\
+Would you like to proceed?
+
+❯ 1. Yes, and auto-accept edits
+  2. Yes, and manually approve edits
+  3. No, keep planning
+"""
+
+
+def make_daemon(tmp_path, log):
+    config = Config(tmp_path / "config.toml")
+    config.data["paths"] = {"log_dirs": [], "manual_log": str(log)}
+    config.data["history"] = {"enabled": False}
+    config.data["daemon"] = dict(config.data["daemon"], quiescence_timeout=5)
+    return ClaudeMonitorDaemon(config)
+
+
+@pytest.mark.parametrize("prompt", [PERMISSION_PROMPT, PLAN_APPROVAL_PROMPT],
+                         ids=["permission", "plan-approval"])
+def test_multi_line_prompt_block_expires(tmp_path, monkeypatch, prompt):
+    log = tmp_path / "claude.log"
+    log.write_text("[TERM:a] Reading src/cli.py\n" +
+                   "".join(f"[TERM:a] {line}\n" for line in prompt.splitlines()))
+    daemon = make_daemon(tmp_path, log)
+    monkeypatch.setattr("src.daemon.time.monotonic", lambda: 100.0)
+
+    daemon._process_log_file(log)
+
+    assert daemon.quiescence.expired(105) == ["a"]
+
+
+def test_output_after_prompt_block_disarms(tmp_path, monkeypatch):
+    log = tmp_path / "claude.log"
+    log.write_text("".join(f"[TERM:a] {line}\n" for line in PLAN_APPROVAL_PROMPT.splitlines()))
+    daemon = make_daemon(tmp_path, log)
+    monkeypatch.setattr("src.daemon.time.monotonic", lambda: 100.0)
+
+    daemon._process_log_file(log)
+    with open(log, "a") as f:
+        f.write("[TERM:a] Updating plan.md\n[TERM:a] 2. Add tests\n")
+    daemon._process_log_file(log)
+
+    assert daemon.quiescence.expired(105) == []
@@ -0,0 +1,60 @@
+"""
+Tests for bulk scanning of large unread log regions
+"""
+
+import pytest
+
+from src.config import Config
+from src.daemon import ClaudeMonitorDaemon
+from src.detector import QuestionDetector
+from src.scanner import BacklogScanner
+
+LOG = (
+    b"[TERM:a] Reading files\n"
+    b"[TERM:a] Shall I proceed with the refactor?\r[TERM:a] \xe2\xa0\x8b Thinking\n"
+    b"[TERM:b] \xe2\xa0\x8b Thinking\r[TERM:b] Want me to add tests?\r\n"
+    b"[TERM:c] {\"tool\": \"AskUserQuestion\"}\r"
+    b"[TERM:c] done\n"
+    b"[TERM:d] What next?\xc2\xa0\n"
+)
+
+
+def detections(tmp_path, data, bulk):
+    """Question detections of one check over data, via the line or bulk path"""
+    log = tmp_path / f"{'bulk' if bulk else 'line'}.log"
+    log.write_bytes(data)
+
+    config = Config(tmp_path / "config.toml")
+    config.data["paths"] = {"log_dirs": [], "manual_log": str(log)}
+    config.data["history"] = {"enabled": False}
+    config.data["daemon"] = dict(config.data["daemon"], bulk_scan_threshold=1 if bulk else 0)
+    daemon = ClaudeMonitorDaemon(config)
+
+    found = []
+    daemon._record_detection = lambda terminal_id, signal_type, now: found.append(terminal_id)
+    daemon._process_log_file(log)
+    return found
+
+
+@pytest.mark.parametrize("repeat", [1, 50])
+def test_bulk_and_line_paths_agree(tmp_path, repeat):
+    data = LOG * repeat
+
+    expected = detections(tmp_path, data, bulk=False)
+
+    assert expected == ["a", "b", "c", "d"] * repeat
+    assert detections(tmp_path, data, bulk=True) == expected
+
+
+def test_partial_last_line_is_left_for_next_scan(tmp_path):
+    log = tmp_path / "claude.log"
+    log.write_bytes(b"[TERM:a] Reading files\n[TERM:a] Shall I proceed")
+    scanner = BacklogScanner()
+
+    assert scanner.scan_file(log, 0) == ([], 23)
+
+    with open(log, "ab") as f:
+        f.write(b" with the refactor?\n[TERM:a] no newline yet")
+
+    assert scanner.scan_file(log, 23) == ([(23, "a", QuestionDetector.RULE_QUESTION)], 67)
+    assert scanner.scan_file(log, 66) == ([], 67)
@@ -0,0 +1,128 @@
+"""
+Tests for on-demand mode under a socket-activating supervisor stand-in
+"""
+
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from src.daemon import PID_FILE
+from src.daemon.sessions import SOCKET_FILE, send_command
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Stand-in for a socket-activating supervisor: moves the listening socket to
+# fd 3 and execs the daemon, which keeps the PID named in LISTEN_PID
+SUPERVISOR = """
+import os, sys
+fd = int(sys.argv[1])
+if fd != 3:
+    os.dup2(fd, 3)
+    os.close(fd)
+os.environ.update(LISTEN_PID=str(os.getpid()), LISTEN_FDS="1")
+os.execv(sys.executable, [sys.executable, "-c", "from src.daemon import main; main()", "--on-demand"])
+"""
+
+pytestmark = pytest.mark.skipif(not Path("/proc/self/task").is_dir(),
+                                reason="counts context switches via Linux /proc")
+
+
+def context_switches(pid):
+    """Voluntary context switches of all threads of a process"""
+    total = 0
+    for task in Path(f"/proc/{pid}/task").iterdir():
+        for line in (task / "status").read_text().splitlines():
+            if line.startswith("voluntary_ctxt_switches:"):
+                total += int(line.split()[1])
+    return total
+
+
+def assert_dormant(pid, seconds=1.5):
+    """The process must not wake up at all for a while"""
+    time.sleep(0.3)  # let it settle into select()
+    before = context_switches(pid)
+    time.sleep(seconds)
+    assert context_switches(pid) == before
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+
+
+def start_daemon(home, exit_when_idle):
+    """Bind the session socket and exec the daemon with it as fd 3, like systemd"""
+    state_dir = home / ".nudge"
+    state_dir.mkdir()
+    (state_dir / "config.toml").write_text(
+        "[paths]\n"
+        "log_dirs = []\n"
+        f"manual_log = \"{state_dir / 'claude.log'}\"\n"
+        "[daemon]\n"
+        "check_interval = 0.2\n"
+        "idle_grace_period = 1\n"
+        f"exit_when_idle = {str(exit_when_idle).lower()}\n"
+    )
+
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(str(state_dir / SOCKET_FILE))
+    listener.listen(16)
+
+    proc = subprocess.Popen(
+        [sys.executable, "-c", SUPERVISOR, str(listener.fileno())],
+        cwd=ROOT,
+        env=dict(os.environ, HOME=str(home)),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        pass_fds=(listener.fileno(),),
+    )
+    listener.close()
+
+    wait_for(lambda: (state_dir / PID_FILE).exists() or proc.poll() is not None)
+    assert proc.poll() is None, proc.communicate()[0].decode()
+    return proc, state_dir / SOCKET_FILE
+
+
+@pytest.mark.parametrize("exit_when_idle", [True, False], ids=["exit", "dormant"])
+def test_sessions_wake_daemon_only_while_active(tmp_path, exit_when_idle):
+    proc, socket_path = start_daemon(tmp_path, exit_when_idle)
+    owner = subprocess.Popen(["sleep", "30"])
+
+    try:
+        assert_dormant(proc.pid)
+
+        assert send_command(socket_path, f"register t1 {owner.pid}") == "ok 1"
+        assert send_command(socket_path, "register t2") == "ok 2"
+        assert send_command(socket_path, "unregister t2") == "ok 1"
+
+        # t1 ends with its owning process, without unregistering
+        owner.kill()
+        owner.wait()
+        wait_for(lambda: send_command(socket_path, "status") == "ok 0")
+        ended = time.monotonic()
+
+        if exit_when_idle:
+            assert proc.wait(timeout=5) == 0
+            assert time.monotonic() - ended >= 0.9
+        else:
+            time.sleep(1.2)  # grace period
+            assert_dormant(proc.pid)
+            proc.send_signal(signal.SIGINT)
+            proc.wait(timeout=5)
+    finally:
+        owner.kill()
+        proc.kill()
+        output = proc.communicate()[0].decode()
+
+    assert "Using listening socket passed by supervisor" in output
+    assert "Session process gone: t1" in output
+    # The supervisor's socket is left in place for the next activation
+    assert socket_path.exists()